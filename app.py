@@ -1,42 +1,436 @@
 # app.py (replace existing encode endpoint)
-from fastapi import FastAPI, File, UploadFile
+import os
+
+# ONNX Runtime sizes its own intra-op pool below; keep the BLAS pools that
+# numpy/OpenCV bring along from also spawning a thread per core. This has
+# to happen before numpy is first imported.
+os.environ.setdefault("OMP_NUM_THREADS", str(os.cpu_count() or 1))
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+
+import ast
+import asyncio
+import base64
+import hashlib
+import io
+import re
+import shutil
+import threading
+import tokenize
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, File, HTTPException, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+import cv2
 import numpy as np
-from insightface.app import FaceAnalysis
-from PIL import Image
-import io
+import onnxruntime as ort
+from insightface.utils import face_align
+from insightface.model_zoo import model_zoo
+from insightface.utils.storage import ensure_available
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    load_models()
+    encode_batcher.start()
+    yield
+    await encode_batcher.stop()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+# Comma-separated list of frontend origins. Starlette has to echo the request
+# Origin back when a wildcard is combined with credentials, so credentials
+# are only enabled for an explicit list
+ALLOWED_ORIGINS = [origin.strip() for origin in os.getenv("ALLOWED_ORIGINS", "*").split(",") if origin.strip()]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
+    allow_origins=ALLOWED_ORIGINS,
+    allow_credentials="*" not in ALLOWED_ORIGINS,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-model = FaceAnalysis(name="buffalo_l", allowed_modules=["detection", "recognition"])
-model.prepare(ctx_id=0, det_size=(640, 640))
+# Cores are shared by the server worker processes (WEB_CONCURRENCY, see
+# startup.sh). Within a process inference runs off the event loop on a pool
+# of INFER_WORKERS threads, and the cores are split between them so
+# concurrent batches don't oversubscribe
+CPU_BUDGET = max(1, (os.cpu_count() or 1) // int(os.getenv("WEB_CONCURRENCY", "1")))
+INFER_WORKERS = max(1, CPU_BUDGET // 2)
+ORT_THREADS = max(1, CPU_BUDGET // INFER_WORKERS)
+
+def _session_options() -> ort.SessionOptions:
+    """ONNX Runtime options tuned for CPU inference"""
+    so = ort.SessionOptions()
+    so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    # detection/recognition are straight conv chains, so spend the threads inside each op
+    so.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    so.intra_op_num_threads = ORT_THREADS
+    so.inter_op_num_threads = 1
+    so.enable_cpu_mem_arena = True
+    so.enable_mem_pattern = True
+    return so
+
+class _TunedInferenceSession(model_zoo.PickableInferenceSession):
+    """InferenceSession that is always created with our SessionOptions"""
+
+    def __init__(self, model_path, **kwargs):
+        kwargs.setdefault("sess_options", _session_options())
+        super().__init__(model_path, **kwargs)
+
+# insightface builds its sessions without SessionOptions, so swap in ours
+model_zoo.PickableInferenceSession = _TunedInferenceSession
+
+# onnxruntime-gpu exposes CUDA; the pinned CPU onnxruntime never does
+USE_CUDA = "CUDAExecutionProvider" in ort.get_available_providers()
+if USE_CUDA:
+    PROVIDERS = ["CUDAExecutionProvider", "CPUExecutionProvider"]
+    PROVIDER_OPTIONS = [
+        {
+            # Grow the arena by what is asked for, not by doubling
+            "arena_extend_strategy": "kSameAsRequested",
+            # Exhaustive cuDNN search makes warm-up slow for no gain at these sizes
+            "cudnn_conv_algo_search": "HEURISTIC",
+        },
+        {},
+    ]
+else:
+    PROVIDERS = ["CPUExecutionProvider"]
+    PROVIDER_OPTIONS = [{}]
+
+INSIGHTFACE_DIR = os.path.expanduser(os.getenv("INSIGHTFACE_DIR", "~/.insightface"))
+# Dynamic INT8 kernels only exist on CPU, so GPUs keep the FP32 models by default
+USE_INT8_MODELS = os.getenv("FACE_MODEL_INT8", "0" if USE_CUDA else "1") == "1"
+DET_SIZE = (640, 640)
+# Uploads that already fit this canvas (typical enrollment crops) are
+# detected at this size instead of being padded out to DET_SIZE
+SMALL_DET_SIZE = (320, 320)
+
+# Worst acceptable FP32-vs-INT8 cosine similarity of an embedding
+INT8_MIN_COSINE = 0.99
+
+def _int8_agreement(det_file: str, fp32_file: str, int8_file: str) -> float:
+    """Lowest FP32-vs-INT8 embedding cosine similarity over the faces in insightface's sample photo"""
+    from insightface.data import get_image
+
+    img = get_image("t1")
+    det = model_zoo.get_model(det_file, providers=PROVIDERS, provider_options=PROVIDER_OPTIONS)
+    det.prepare(ctx_id=0, input_size=DET_SIZE, det_thresh=0.5)
+    _, kpss = det.detect(img, input_size=DET_SIZE, max_num=0, metric="default")
+    if kpss is None or len(kpss) == 0:
+        raise RuntimeError("no faces found in the INT8 calibration check image")
+
+    feats = []
+    for rec_file in (fp32_file, int8_file):
+        rec = model_zoo.get_model(rec_file, providers=PROVIDERS, provider_options=PROVIDER_OPTIONS)
+        rec.prepare(ctx_id=0)
+        crops = [face_align.norm_crop(img, landmark=kps, image_size=rec.input_size[0]) for kps in kpss]
+        feat = rec.get_feat(crops)
+        feats.append(feat / np.linalg.norm(feat, axis=1, keepdims=True))
+    return float(np.sum(feats[0] * feats[1], axis=1).min())
+
+def _quantized_model_pack(name: str, det_file: str, rec_file: str) -> str:
+    """Build (once) a copy of a model pack with an INT8 recognition model and return its name
+
+    The quantized model is only kept if its embeddings stay within
+    INT8_MIN_COSINE of the FP32 model's; otherwise the FP32 pack is used.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    src_dir = ensure_available("models", name, root=INSIGHTFACE_DIR)
+    int8_name = f"{name}_rec_int8"
+    dst_dir = os.path.join(INSIGHTFACE_DIR, "models", int8_name)
+    os.makedirs(dst_dir, exist_ok=True)
+
+    det_dst = os.path.join(dst_dir, det_file)
+    if not os.path.exists(det_dst):
+        shutil.copyfile(os.path.join(src_dir, det_file), det_dst + ".tmp")
+        os.replace(det_dst + ".tmp", det_dst)
+
+    rec_dst = os.path.join(dst_dir, rec_file)
+    rejected = rec_dst + ".rejected"
+    if os.path.exists(rejected):
+        return name
+    if not os.path.exists(rec_dst):
+        # model_zoo only loads paths ending in .onnx
+        tmp = os.path.join(dst_dir, f"tmp_{rec_file}")
+        # ORT's CPU ConvInteger kernel only takes uint8 weights
+        quantize_dynamic(os.path.join(src_dir, rec_file), tmp, weight_type=QuantType.QUInt8)
+        similarity = _int8_agreement(os.path.join(src_dir, det_file), os.path.join(src_dir, rec_file), tmp)
+        if similarity < INT8_MIN_COSINE:
+            os.remove(tmp)
+            with open(rejected, "w") as f:
+                f.write(f"{similarity}\n")
+            print(f"INT8 {rec_file} rejected: cosine similarity {similarity:.4f} < {INT8_MIN_COSINE}; using FP32")
+            return name
+        print(f"INT8 {rec_file} accepted: cosine similarity {similarity:.4f}")
+        os.replace(tmp, rec_dst)
+    return int8_name
+
+# buffalo_s (MobileFaceNet) embeddings live in a different feature space than
+# buffalo_l (ResNet50): faces enrolled with the old model must be re-enrolled
+model_name = "buffalo_s"
+DET_MODEL_FILE = "det_500m.onnx"
+REC_MODEL_FILE = "w600k_mbf.onnx"
+if USE_INT8_MODELS:
+    # Recognition dominates CPU time; the detector is already tiny and its box
+    # and landmark regression loses accuracy under dynamic quantization
+    model_name = _quantized_model_pack(model_name, DET_MODEL_FILE, REC_MODEL_FILE)
+model_dir = ensure_available("models", model_name, root=INSIGHTFACE_DIR)
+
+det_model = None
+rec_model = None
+
+def warm_up():
+    """Run dummy inferences so the first real request doesn't pay ORT's setup cost"""
+    for w, h in (DET_SIZE, SMALL_DET_SIZE):
+        det_model.detect(np.zeros((h, w, 3), dtype=np.uint8), input_size=(w, h), max_num=0, metric="default")
+    # A blank image has no face, so exercise the recognition session directly
+    size = rec_model.input_size[0]
+    rec_model.get_feat([np.zeros((size, size, 3), dtype=np.uint8)])
+
+def load_models():
+    """Create the ONNX Runtime sessions and warm them up.
+
+    Called from the lifespan handler so that under ``gunicorn --preload``
+    every worker builds its own sessions after the fork: ORT's thread pools
+    do not survive fork(), while the imported modules and the model
+    download/quantization above happen once in the master.
+    """
+    global det_model, rec_model
+
+    # Only the two models /encode needs are loaded; FaceAnalysis would also open
+    # a session for every other model in the pack just to throw it away
+    ort.set_default_logger_severity(3)
+    det_model = model_zoo.get_model(
+        os.path.join(model_dir, DET_MODEL_FILE), providers=PROVIDERS, provider_options=PROVIDER_OPTIONS
+    )
+    det_model.prepare(ctx_id=0, input_size=DET_SIZE, det_thresh=0.5)
+    rec_model = model_zoo.get_model(
+        os.path.join(model_dir, REC_MODEL_FILE), providers=PROVIDERS, provider_options=PROVIDER_OPTIONS
+    )
+    rec_model.prepare(ctx_id=0)
+    warm_up()
+
+_resize_buffers = threading.local()
+
+def _resize_buffer(h: int, w: int) -> np.ndarray:
+    """An (h, w, 3) view of this thread's reusable DET_SIZE-sized buffer"""
+    buf = getattr(_resize_buffers, "buf", None)
+    if buf is None:
+        buf = _resize_buffers.buf = np.empty(DET_SIZE[0] * DET_SIZE[1] * 3, dtype=np.uint8)
+    return buf[:h * w * 3].reshape(h, w, 3)
+
+def decode_image(img_bytes: bytes):
+    """Decode an upload into a BGR array that fits inside DET_SIZE (None if undecodable).
+
+    Downscaled images live in a per-thread buffer, so the result is only
+    valid until the next decode_image() call on the same thread.
+    """
+    arr = cv2.imdecode(np.frombuffer(img_bytes, np.uint8), cv2.IMREAD_COLOR)
+    if arr is None:
+        return None
+
+    # The detector works on a 640x640 canvas anyway; shrinking here keeps
+    # insightface's own resize small for phone photos
+    h, w = arr.shape[:2]
+    scale = min(DET_SIZE[0] / w, DET_SIZE[1] / h)
+    if scale < 1:
+        # Clamp like PIL's thumbnail(): a 1x3001 strip must not round to 0 px
+        new_w, new_h = max(1, round(w * scale)), max(1, round(h * scale))
+        arr = cv2.resize(arr, (new_w, new_h), dst=_resize_buffer(new_h, new_w), interpolation=cv2.INTER_AREA)
+    return arr
+
+def _face_crop(img_bytes: bytes):
+    """Aligned crop of the best-scoring face in an upload (None when there is no face)"""
+    # insightface expects BGR, which is what OpenCV decodes to. The array
+    # may be this thread's resize buffer, so it is only used up to
+    # norm_crop(), which copies the face out
+    arr = decode_image(img_bytes)
+    if arr is None:
+        raise HTTPException(status_code=400, detail="INVALID_IMAGE")
+
+    # Faces come back best score first, matching FaceAnalysis.get() order
+    h, w = arr.shape[:2]
+    det_size = SMALL_DET_SIZE if w <= SMALL_DET_SIZE[0] and h <= SMALL_DET_SIZE[1] else DET_SIZE
+    bboxes, kpss = det_model.detect(arr, input_size=det_size, max_num=0, metric="default")
+    if bboxes.shape[0] == 0:
+        return None
+    return face_align.norm_crop(arr, landmark=kpss[0], image_size=rec_model.input_size[0])
+
+def embed_batch(images: list) -> list:
+    """Embed the first face of each upload with a single recognition call.
+
+    Each result is the normalized embedding, None when no face was found,
+    or the exception to raise for that upload.
+    """
+    results = [None] * len(images)
+    crops, owners = [], []
+    for i, img_bytes in enumerate(images):
+        # A bad upload fails only its own request, not the whole batch
+        try:
+            crop = _face_crop(img_bytes)
+        except Exception as e:
+            results[i] = e
+            continue
+        if crop is not None:
+            crops.append(crop)
+            owners.append(i)
+
+    if crops:
+        try:
+            feats = rec_model.get_feat(crops)
+            feats /= np.linalg.norm(feats, axis=1, keepdims=True)
+            # Separate arrays, so a cached embedding doesn't keep the whole batch alive
+            feats = [feat.copy() for feat in feats]
+        except Exception as e:
+            feats = [e] * len(crops)
+        for i, feat in zip(owners, feats):
+            results[i] = feat
+    return results
+
+# One batch per worker thread
+_infer_pool = ThreadPoolExecutor(max_workers=INFER_WORKERS, thread_name_prefix="face-infer")
+
+class BatchScheduler:
+    """Coalesces concurrent /encode uploads into batches for embed_batch()"""
+
+    def __init__(self, max_batch: int = 8, max_wait: float = 0.01):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        # Bounded so a burst of uploads waits in the request handlers
+        # instead of piling images up in memory
+        self._queue = asyncio.Queue(maxsize=INFER_WORKERS * max_batch)
+        self._slots = asyncio.Semaphore(INFER_WORKERS)
+        self._task = None
+        self._inflight = set()
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._collect())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def submit(self, img_bytes: bytes):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((img_bytes, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # While every worker is busy the queue keeps filling, so the
+            # next batch grows with load
+            await self._slots.acquire()
+            task = loop.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: list):
+        # Drop uploads whose request already gave up waiting
+        batch = [item for item in batch if not item[1].done()]
+        if not batch:
+            self._slots.release()
+            return
+
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                _infer_pool, embed_batch, [img_bytes for img_bytes, _ in batch]
+            )
+        except Exception as e:
+            results = [e] * len(batch)
+        finally:
+            self._slots.release()
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+# A GPU forward pass costs about the same for 1 or 16 crops, so let batches grow
+encode_batcher = BatchScheduler(max_batch=16 if USE_CUDA else 8)
+# Upper bound on queueing plus inference for one upload
+ENCODE_TIMEOUT = float(os.getenv("ENCODE_TIMEOUT", "30"))
+
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+UPLOAD_CHUNK_BYTES = 64 * 1024
+
+async def read_upload(file: UploadFile) -> bytes | bytearray:
+    """Read an upload in chunks, rejecting it with 413 once it passes MAX_UPLOAD_BYTES"""
+    if file.size is not None:
+        if file.size > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="IMAGE_TOO_LARGE")
+        # Size is known up front: one exactly-sized read, no regrowing buffer
+        return await file.read()
+
+    buf = bytearray()
+    while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+        buf += chunk
+        if len(buf) > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="IMAGE_TOO_LARGE")
+    return buf
+
+# Re-uploads of the same image (e.g. enrollment retries) skip inference;
+# only touched from the event loop, so no locking is needed
+EMBEDDING_CACHE_SIZE = 1024
+_embedding_cache = OrderedDict()
 
 @app.post("/encode")
-async def encode(file: UploadFile = File(...)):
-    img_bytes = await file.read()
-    img = Image.open(io.BytesIO(img_bytes)).convert("RGB")
-    arr = np.array(img)
+async def encode(file: UploadFile = File(...), compact: bool = False):
+    img_bytes = await read_upload(file)
 
-    faces = model.get(arr)
-    if not faces:
+    key = hashlib.blake2b(img_bytes, digest_size=16).digest()
+    if key in _embedding_cache:
+        _embedding_cache.move_to_end(key)
+        embedding = _embedding_cache[key]
+    else:
+        try:
+            embedding = await asyncio.wait_for(encode_batcher.submit(img_bytes), ENCODE_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=503, detail="ENCODE_TIMEOUT")
+        _embedding_cache[key] = embedding
+        if len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+            _embedding_cache.popitem(last=False)
+
+    if embedding is None:
         return {"error": "NO_FACE_FOUND"}
 
-    # Use normalized embedding (unit vector) — stable for matching
-    embedding = faces[0].normed_embedding.tolist()
-    return {"embedding": embedding}
+    if compact:
+        # ~1 KB of base64 instead of ~7 KB of decimal floats; decode with
+        # np.frombuffer(base64.b64decode(s), dtype=np.float16)
+        return {
+            "embedding_b64": base64.b64encode(embedding.astype(np.float16).tobytes()).decode(),
+            "dtype": "float16",
+            "dim": embedding.shape[0],
+        }
+
+    # Use normalized embedding (unit vector) — stable for matching.
+    # Returned as a response object so orjson serializes the ndarray
+    # directly instead of FastAPI's jsonable_encoder walking a list
+    return ORJSONResponse({"embedding": embedding})
 
 # ============================================================
 # CODE COMPILER ENDPOINTS
 # ============================================================
 from code_executor import CodeExecutor
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class CodeExecutionRequest(BaseModel):
     language: str
@@ -77,8 +471,72 @@ async def get_supported_languages():
 # AI GENERATION ENDPOINT - Smart Code Analysis & Fixes
 # ============================================================
 
+MAX_PROMPT_LENGTH = 32 * 1024
+
 class AIRequest(BaseModel):
-    prompt: str
+    prompt: str = Field(..., max_length=MAX_PROMPT_LENGTH)
+
+_NAME_ERROR_RE = re.compile(r"name '(\w+)' is not defined")
+_ASSIGN_RE = re.compile(r'\b([a-zA-Z_]\w*)\s*=')
+_PRINT_STMT_RE = re.compile(r'\bprint\s+([^(].*?)(?=\n|$)')
+_ON_LINE_RE = re.compile(r'on line (\d+)')
+_BLOCK_KEYWORDS = ('if ', 'elif ', 'else', 'for ', 'while ', 'def ', 'class ')
+_MAX_SYNTAX_FIXES = 20
+
+def _fix_syntax_errors(code: str):
+    """Repair Python syntax errors one at a time at the line ast.parse reports.
+
+    Returns the fixed code and the fixes applied; no fixes means the code
+    already parses or its first error has no targeted fix.
+    """
+    lines = code.split('\n')
+    explanation = []
+
+    for _ in range(_MAX_SYNTAX_FIXES):
+        try:
+            ast.parse('\n'.join(lines))
+            break
+        except SyntaxError as e:
+            if not e.lineno or e.lineno > len(lines):
+                break
+            i = e.lineno - 1
+            line = lines[i]
+            stripped = line.strip()
+
+            if isinstance(e, IndentationError) and e.msg.startswith('expected an indented block'):
+                # Python 3.10+ names the header line; older versions point just past it
+                match = _ON_LINE_RE.search(e.msg)
+                if match:
+                    header_idx = int(match.group(1)) - 1
+                else:
+                    header_idx = next((j for j in range(i - 1, -1, -1) if lines[j].strip()), i)
+                header = lines[header_idx]
+                indent = header[:len(header) - len(header.lstrip())] + '    '
+                lines.insert(header_idx + 1, indent + 'pass  # TODO: Add your code here')
+                explanation.append(f"Added indentation after '{header.strip()}'")
+            elif e.msg == "expected ':'" and stripped.startswith(_BLOCK_KEYWORDS) and '#' not in stripped:
+                lines[i] = line.rstrip() + ':'
+                explanation.append(f"Added missing colon to: {stripped}")
+            elif e.msg.startswith('Missing parentheses in call to'):
+                fixed_line = _PRINT_STMT_RE.sub(r'print(\1)', line)
+                if fixed_line == line:
+                    break
+                lines[i] = fixed_line
+                explanation.append("Added parentheses to print() for Python 3")
+            else:
+                break
+
+    return '\n'.join(lines), explanation
+
+def _assigned_names(code: str) -> list:
+    """Names bound in the code, in source order"""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return _ASSIGN_RE.findall(code)
+    names = [node for node in ast.walk(tree) if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store)]
+    names.sort(key=lambda node: (node.lineno, node.col_offset))
+    return [node.id for node in names]
 
 def fix_common_errors(code: str, error: str, language: str) -> str:
     """Detect and fix common coding errors with proper indentation"""
@@ -87,10 +545,14 @@ def fix_common_errors(code: str, error: str, language: str) -> str:
     explanation = []
     
     if language.lower() == 'python':
-        import re
-        
+        # Let the parser point at the broken lines first; the text
+        # heuristics below only run when it finds nothing to fix
+        ast_fixed_code, explanation = _fix_syntax_errors(code)
+        if explanation:
+            fixed_code = ast_fixed_code
+
         # Fix indentation errors
-        if 'IndentationError' in error or 'expected an indented block' in error:
+        elif 'IndentationError' in error or 'expected an indented block' in error:
             lines = code.split('\n')
             fixed_lines = []
             for i, line in enumerate(lines):
@@ -120,10 +582,10 @@ def fix_common_errors(code: str, error: str, language: str) -> str:
         
         # Fix undefined variables (NameError)
         elif 'NameError' in error:
-            match = re.search(r"name '(\w+)' is not defined", error)
+            match = _NAME_ERROR_RE.search(error)
             if match:
                 undefined_var = match.group(1)
-                defined_vars = re.findall(r'\b([a-zA-Z_]\w*)\s*=', code)
+                defined_vars = _assigned_names(code)
                 fixed = False
                 
                 for var in defined_vars:
@@ -139,7 +601,7 @@ def fix_common_errors(code: str, error: str, language: str) -> str:
         
         # Fix missing parentheses in print (Python 2 to 3)
         elif 'SyntaxError' in error and 'print' in code:
-            fixed_code = re.sub(r'\bprint\s+([^(].*?)(?=\n|$)', r'print(\1)', code)
+            fixed_code = _PRINT_STMT_RE.sub(r'print(\1)', code)
             if fixed_code != code:
                 explanation.append("Added parentheses to print() for Python 3")
     
@@ -171,6 +633,72 @@ def fix_common_errors(code: str, error: str, language: str) -> str:
 {code}
 ```"""
 
+_WORD_RE = re.compile(r'[A-Za-z_]\w*|\S')
+_RANGE_LEN_LOOP = ['in', 'range', '(', 'len', '(']
+
+def _code_tokens(code: str) -> list:
+    """(is_name, text) pairs for the names and operators in Python code.
+
+    Strings and comments are skipped; code that doesn't tokenize falls
+    back to a plain word scan.
+    """
+    try:
+        return [
+            (tok.type == tokenize.NAME, tok.string)
+            for tok in tokenize.generate_tokens(io.StringIO(code).readline)
+            if tok.type in (tokenize.NAME, tokenize.OP)
+        ]
+    except (tokenize.TokenError, SyntaxError):
+        return [(text[0].isalpha() or text[0] == '_', text) for text in _WORD_RE.findall(code)]
+
+def _scan_python_code(code: str) -> dict:
+    """Collect everything generate_smart_suggestions checks in one pass over the tokens"""
+    flags = {
+        'get_call': False,
+        'list_call': False,
+        'map_call': False,
+        'hash_or_dict': False,
+        'range_len_loop': False,
+        'print_calls': 0,
+        'for_loop': False,
+        'append_call': False,
+        'bracket_before_for': False,
+        'in_op': False,
+        'list_name': False,
+    }
+    tokens = _code_tokens(code)
+    for i, (is_name, text) in enumerate(tokens):
+        if not is_name:
+            if text == '[' and not flags['for_loop']:
+                flags['bracket_before_for'] = True
+            continue
+
+        lower = text.lower()
+        if 'hash' in lower or 'dict' in lower:
+            flags['hash_or_dict'] = True
+        if 'list' in lower:
+            flags['list_name'] = True
+
+        if text == 'in':
+            flags['in_op'] = True
+        elif text == 'for':
+            flags['for_loop'] = True
+            # for <name> in range(len(
+            if [t for _, t in tokens[i + 2:i + 7]] == _RANGE_LEN_LOOP:
+                flags['range_len_loop'] = True
+        elif i + 1 < len(tokens) and tokens[i + 1][1] == '(':
+            if text == 'print':
+                flags['print_calls'] += 1
+            elif text == 'append':
+                flags['append_call'] = True
+            elif text == 'list':
+                flags['list_call'] = True
+            elif text == 'map':
+                flags['map_call'] = True
+            elif text == 'get' and i > 0 and tokens[i - 1][1] == '.':
+                flags['get_call'] = True
+    return flags
+
 def generate_smart_suggestions(code: str, language: str) -> str:
     """Generate intelligent code suggestions for successful code"""
     
@@ -178,32 +706,34 @@ def generate_smart_suggestions(code: str, language: str) -> str:
     
     # Python-specific analysis
     if language.lower() == 'python':
+        flags = _scan_python_code(code)
+
         # Positive feedback for good practices
-        if '.get(' in code:
+        if flags['get_call']:
             suggestions.append("✓ Excellent use of .get() method for safe dictionary access. This prevents KeyError exceptions.")
         
-        if 'list(' in code and 'map(' in code:
+        if flags['list_call'] and flags['map_call']:
             suggestions.append("✓ Good use of map() for functional programming. Your code efficiently transforms input data.")
         
-        if 'hash' in code.lower() or 'dict' in code.lower():
+        if flags['hash_or_dict']:
             suggestions.append("✓ Using dictionaries for frequency counting is an optimal O(n) solution. Well done!")
         
         # Constructive suggestions
-        if 'for i in range(len(' in code:
+        if flags['range_len_loop']:
             suggestions.append("→ Consider: Instead of 'for i in range(len(list))', use 'for item in list' for cleaner, more Pythonic code.")
         
-        if code.count('print(') > 2:
+        if flags['print_calls'] > 2:
             suggestions.append("→ Tip: For production code, consider using the logging module instead of multiple print statements.")
         
-        if 'for' in code and 'append(' in code and '[' not in code.split('for')[0]:
+        if flags['for_loop'] and flags['append_call'] and not flags['bracket_before_for']:
             suggestions.append("→ Optimization: List comprehensions can be faster than for-loops with append(). Example: [x*2 for x in list]")
         
         # Code quality tips
-        if len(code.split('\n')) < 10:
+        if code.count('\n') < 9:
             suggestions.append("→ Maintainability: Your code is concise. For complex logic, add comments to explain the approach.")
         
         # Performance insights
-        if 'in' in code and 'list' in code:
+        if flags['in_op'] and flags['list_name']:
             suggestions.append("→ Performance: Checking 'if x in list' is O(n). For frequent lookups, use sets or dictionaries for O(1) performance.")
     
     # General programming wisdom
@@ -220,41 +750,49 @@ def generate_smart_suggestions(code: str, language: str) -> str:
     
     return "\n\n".join(suggestions[:5])  # Limit to 5 suggestions
 
+# Each pattern finds its section in one pass over the prompt, stopping where
+# the old chained str.split() calls stopped
+_CODE_BLOCK_RE = re.compile(r'```(.*?)(?:```|\Z)', re.S)
+_CODE_SECTION_RE = re.compile(r'Code:(.*?)(?:Code:|Provide|Error:|\Z)', re.S)
+_ERROR_SECTION_RE = re.compile(r'Error:(.*?)(?:Error:|Provide|\Z)', re.S)
+_ERROR_WORD_RE = re.compile(r'error', re.I)
+_CODE_LANGUAGES = ('python', 'java', 'c', 'cpp')
+
+def parse_prompt(prompt: str):
+    """Split an AI prompt into (code, language, error, is_error)"""
+    code = ""
+    language = "python"
+    error = ""
+    is_error = _ERROR_WORD_RE.search(prompt) is not None
+
+    # Prefer a fenced code block, optionally tagged with its language
+    block = _CODE_BLOCK_RE.search(prompt)
+    if block:
+        first_line, _, rest = block.group(1).partition('\n')
+        if first_line.strip() in _CODE_LANGUAGES:
+            language = first_line.strip()
+            code = rest
+        else:
+            code = block.group(1)
+
+    # Otherwise fall back to a "Code:" section
+    if not code:
+        section = _CODE_SECTION_RE.search(prompt)
+        if section:
+            code = section.group(1).strip()
+
+    # Extract error message
+    if is_error:
+        section = _ERROR_SECTION_RE.search(prompt)
+        error = section.group(1).strip() if section else prompt
+
+    return code, language, error, is_error
+
 @app.post("/api/ai/generate")
 async def generate_ai_response(request: AIRequest):
     """Generate code fixes for errors or suggestions for successful code"""
     try:
-        # Extract code and language from prompt
-        code = ""
-        language = "python"
-        error = ""
-        is_error = "error" in request.prompt.lower()
-        
-        # Parse the prompt
-        if "```" in request.prompt:
-            parts = request.prompt.split("```")
-            if len(parts) >= 2:
-                code_block = parts[1]
-                lines = code_block.split('\n')
-                if lines and lines[0].strip() in ['python', 'java', 'c', 'cpp']:
-                    language = lines[0].strip()
-                    code = '\n'.join(lines[1:])
-                else:
-                    code = code_block
-        
-        # Try to extract code from prompt
-        if not code and "Code:" in request.prompt:
-            try:
-                code = request.prompt.split("Code:")[1].split("Provide")[0].split("Error:")[0].strip()
-            except:
-                code = request.prompt
-        
-        # Extract error message
-        if "Error:" in request.prompt or "error" in request.prompt.lower():
-            try:
-                error = request.prompt.split("Error:")[1].split("Provide")[0].strip() if "Error:" in request.prompt else request.prompt
-            except:
-                error = request.prompt
+        code, language, error, is_error = parse_prompt(request.prompt)
         
         # Generate response based on whether it's an error or success
         if is_error and error:
@@ -1,32 +1,520 @@
 """
 Code Executor Service
 Executes code in Python, Java, C, and C++ with security measures
+
+Subprocesses are started with close_fds=False so CPython can launch them
+with posix_spawn() (vfork semantics) instead of fork()+exec(), whose cost
+grows with the size of the server process. This is safe because every fd
+Python opens is non-inheritable by default (PEP 446): children only get
+stdin/stdout/stderr, never the server's sockets or model files. Do not
+mark long-lived fds inheritable in the server process.
 """
 import subprocess
 import sys
 import os
 import tempfile
 import shutil
+import atexit
+import hashlib
+import hmac
+import itertools
+import math
+import re
+import select
+import signal
+import threading
+from collections import deque
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
 from typing import Dict, Optional
 import time
 
+try:
+    import fcntl
+    import resource
+except ImportError:  # Windows
+    fcntl = None
+    resource = None
+
+from python_worker import REQUEST, RESPONSE
+
+class PythonWorkerPool:
+    """Persistent Python interpreters that run snippets via python_worker.py
+
+    Workers are started on demand, up to `size` at a time, and reused
+    between runs. A worker that times out or dies is killed together with
+    the snippet it forked and replaced by a fresh one on the next run.
+    """
+
+    WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "python_worker.py")
+
+    def __init__(self, size: Optional[int] = None):
+        self.size = size or os.cpu_count() or 1
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._idle = deque()
+        self._workers = set()
+        atexit.register(self.close)
+
+    def run(self, code: str, input_data: str, timeout: float, memory_limit: int = 0) -> subprocess.CompletedProcess:
+        """Run code on an idle worker; raises subprocess.TimeoutExpired like subprocess.run
+
+        The snippet's CPU time is capped at timeout and, when memory_limit
+        is set, its address space at memory_limit bytes.
+        """
+        with self._slots:
+            worker = self._acquire()
+            try:
+                result = self._submit(worker, code, input_data, timeout, memory_limit)
+            except BaseException:
+                self._kill(worker)
+                raise
+
+            if worker.poll() is None:
+                with self._lock:
+                    self._idle.append(worker)
+            else:
+                self._kill(worker)
+            return result
+
+    def close(self):
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            self._kill(worker)
+
+    def _acquire(self) -> subprocess.Popen:
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.poll() is None:
+                    return worker
+                self._workers.discard(worker)
+
+        worker = subprocess.Popen(
+            [sys.executable, self.WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            close_fds=False,
+            start_new_session=True
+        )
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _kill(self, worker: subprocess.Popen):
+        # The worker leads its own process group, which includes the running snippet
+        try:
+            os.killpg(worker.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        worker.wait()
+        worker.stdin.close()
+        worker.stdout.close()
+        with self._lock:
+            self._workers.discard(worker)
+
+    def _submit(
+        self, worker: subprocess.Popen, code: str, input_data: str, timeout: float, memory_limit: int
+    ) -> subprocess.CompletedProcess:
+        args = [sys.executable, "-c", code]
+        code_bytes = code.encode()
+        input_bytes = input_data.encode()
+        cpu_limit = math.ceil(timeout)
+        worker.stdin.write(REQUEST.pack(len(code_bytes), len(input_bytes), cpu_limit, memory_limit) + code_bytes + input_bytes)
+        worker.stdin.flush()
+
+        deadline = time.monotonic() + timeout
+        header = self._read(worker, RESPONSE.size, deadline, timeout)
+        if header is None:
+            # The worker itself died
+            return subprocess.CompletedProcess(args, worker.wait(), "", "")
+
+        returncode, out_len, err_len = RESPONSE.unpack(header)
+        body = self._read(worker, out_len + err_len, deadline, timeout) or b""
+        stdout = _decode(body[:out_len])
+        stderr = _decode(body[out_len:])
+        return subprocess.CompletedProcess(args, returncode, stdout, stderr)
+
+    @staticmethod
+    def _read(worker: subprocess.Popen, size: int, deadline: float, timeout: float) -> Optional[bytes]:
+        """Read exactly size bytes from the worker before the deadline (None on EOF)"""
+        fd = worker.stdout.fileno()
+        chunks = []
+        while size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                raise subprocess.TimeoutExpired(worker.args, timeout)
+            chunk = os.read(fd, size)
+            if not chunk:
+                return None
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+# select() on pipes is POSIX-only; elsewhere every run gets a fresh interpreter
+_python_pool = PythonWorkerPool() if os.name == "posix" else None
+
+_HAVE_POSIX_SPAWN = all(hasattr(os, name) for name in ("posix_spawnp", "memfd_create", "pipe2"))
+
+def _decode(data: bytes) -> str:
+    """Decode child output the way subprocess's text mode does"""
+    return data.decode(errors="replace").replace("\r\n", "\n").replace("\r", "\n")
+
+def _pidfd_open(pid: int) -> Optional[int]:
+    """A pollable fd that becomes readable when pid exits (Linux 5.3+), else None"""
+    try:
+        return os.pidfd_open(pid)
+    except (AttributeError, OSError):
+        return None
+
+def _set_limits(pid: int, cpu_limit: Optional[int], memory_limit: Optional[int]):
+    """Apply kernel-enforced CPU-time/address-space limits to a running child"""
+    if not hasattr(resource, "prlimit"):
+        return
+    try:
+        if cpu_limit is not None:
+            # SIGXCPU at the soft limit, SIGKILL a second later
+            resource.prlimit(pid, resource.RLIMIT_CPU, (cpu_limit, cpu_limit + 1))
+        if memory_limit is not None:
+            resource.prlimit(pid, resource.RLIMIT_AS, (memory_limit, memory_limit))
+    except ProcessLookupError:
+        pass
+
+def _spawn_and_wait(
+    argv: list,
+    input_data: str = "",
+    timeout: Optional[float] = None,
+    cpu_limit: Optional[int] = None,
+    memory_limit: Optional[int] = None
+) -> subprocess.CompletedProcess:
+    """subprocess.run(argv, input=..., capture_output=True, text=True) via a direct posix_spawn
+
+    stdin is a memfd holding the whole input and stdout/stderr are
+    O_CLOEXEC pipes, which skips subprocess's Python-side launch plumbing.
+    cpu_limit (seconds) and memory_limit (bytes) are set on the child with
+    prlimit() right after the spawn, so the kernel stops a busy loop
+    without waiting for the wall-clock timeout; running out of CPU time
+    raises subprocess.TimeoutExpired like the timeout does. Falls back to
+    subprocess.run, without the limits, where these calls are unavailable.
+    """
+    if not _HAVE_POSIX_SPAWN:
+        return subprocess.run(
+            argv,
+            input=input_data,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            close_fds=False
+        )
+
+    out_r, out_w = os.pipe2(os.O_CLOEXEC)
+    err_r, err_w = os.pipe2(os.O_CLOEXEC)
+    stdin_fd = os.memfd_create("stdin", os.MFD_CLOEXEC)
+    try:
+        os.write(stdin_fd, input_data.encode())
+        os.lseek(stdin_fd, 0, os.SEEK_SET)
+        pid = os.posix_spawnp(
+            argv[0],
+            argv,
+            os.environ,
+            file_actions=[
+                (os.POSIX_SPAWN_DUP2, stdin_fd, 0),
+                (os.POSIX_SPAWN_DUP2, out_w, 1),
+                (os.POSIX_SPAWN_DUP2, err_w, 2),
+            ],
+            # Python ignores these; give the child the default handlers like subprocess does
+            setsigdef=(signal.SIGPIPE, signal.SIGXFSZ)
+        )
+    except BaseException:
+        os.close(out_r)
+        os.close(err_r)
+        raise
+    finally:
+        os.close(stdin_fd)
+        os.close(out_w)
+        os.close(err_w)
+    _set_limits(pid, cpu_limit, memory_limit)
+
+    # The child's exit is one more event in the same poll set as its pipes,
+    # so a single poll() covers stdout, stderr and the wait
+    pidfd = _pidfd_open(pid)
+    output = {out_r: [], err_r: []}
+    poller = select.poll()
+    for fd in output:
+        poller.register(fd, select.POLLIN)
+    if pidfd is not None:
+        poller.register(pidfd, select.POLLIN)
+    open_fds = set(output)
+    exited = pidfd is None
+    deadline = None if timeout is None else time.monotonic() + timeout
+    try:
+        while open_fds or not exited:
+            wait_ms = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise subprocess.TimeoutExpired(argv, timeout)
+                wait_ms = int(remaining * 1000) + 1
+            for fd, _ in poller.poll(wait_ms):
+                if fd == pidfd:
+                    poller.unregister(pidfd)
+                    exited = True
+                    continue
+                chunk = os.read(fd, 65536)
+                if chunk:
+                    output[fd].append(chunk)
+                else:
+                    poller.unregister(fd)
+                    open_fds.discard(fd)
+        _, status = os.waitpid(pid, 0)
+    except BaseException:
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+        raise
+    finally:
+        os.close(out_r)
+        os.close(err_r)
+        if pidfd is not None:
+            os.close(pidfd)
+
+    returncode = os.waitstatus_to_exitcode(status)
+    if cpu_limit is not None and returncode == -signal.SIGXCPU:
+        raise subprocess.TimeoutExpired(argv, timeout)
+    return subprocess.CompletedProcess(
+        argv,
+        returncode,
+        _decode(b"".join(output[out_r])),
+        _decode(b"".join(output[err_r]))
+    )
+
+# Compiled Java classes and C/C++ binaries, keyed by a hash of their source
+CODE_CACHE_DIR = Path(tempfile.gettempdir()) / "codecache"
+# Builds kept per language; the least recently used ones beyond this are pruned
+CODE_CACHE_MAX_ENTRIES = 256
+# Entries used this recently are never pruned, so a run can't lose its build mid-flight
+CODE_CACHE_MIN_AGE = 60  # seconds
+# Signs every published build. It lives only in memory, so server workers
+# must be forked from one master that imported this module (gunicorn
+# --preload, as startup.sh does) to trust each other's builds. Without that,
+# e.g. under `uvicorn --workers N`, each worker evicts and rebuilds what the
+# others compiled. Builds from an earlier server run are rebuilt the same way
+_CACHE_KEY = os.urandom(32)
+_SEAL_NAME = ".seal"
+
+_compiler_versions = {}
+
+def _compiler_version(compiler: str) -> str:
+    """First line of `compiler --version`, so cached binaries follow compiler upgrades"""
+    if compiler not in _compiler_versions:
+        result = subprocess.run(
+            [compiler, "--version"],
+            capture_output=True,
+            text=True,
+            timeout=CodeExecutor.TIMEOUT,
+            close_fds=False
+        )
+        _compiler_versions[compiler] = result.stdout.split("\n", 1)[0]
+    return _compiler_versions[compiler]
+
+def _cache_entry(kind: str, *parts: str) -> Path:
+    digest = hashlib.blake2b("\0".join(parts).encode(), digest_size=16).hexdigest()
+    return CODE_CACHE_DIR / kind / digest
+
+def _seal(build_dir: str) -> bytes:
+    """Keyed digest of every file in a build, so a tampered build can be told apart"""
+    digest = hashlib.blake2b(key=_CACHE_KEY)
+    with os.scandir(build_dir) as entries:
+        names = sorted(entry.name for entry in entries if entry.name != _SEAL_NAME)
+    for name in names:
+        with open(os.path.join(build_dir, name), "rb") as f:
+            data = f.read()
+        digest.update(f"{name}\0{len(data)}\0".encode())
+        digest.update(data)
+    return digest.digest()
+
+def _cache_hit(entry: Path) -> bool:
+    """Whether an intact build is cached; a hit also bumps its mtime for LRU pruning
+
+    User programs run with the server's uid (root in the Docker image), so
+    file permissions alone can't stop one from rewriting a cached build
+    that a later identical submission would run. A build that can't be
+    verified (seal missing or unreadable, files that don't match it, or
+    anything but plain files inside) is evicted and treated as a miss.
+    """
+    if not os.path.lexists(entry):
+        return False
+    try:
+        with open(entry / _SEAL_NAME, "rb") as f:
+            seal = f.read()
+        intact = hmac.compare_digest(seal, _seal(str(entry)))
+    except OSError:
+        intact = False
+    if not intact:
+        _evict(str(entry))
+        return False
+    try:
+        os.utime(entry)
+    except OSError:
+        pass
+    return True
+
+@contextmanager
+def _cache_lock(entry: Path):
+    """Serialize builds of the same entry across threads and server processes
+
+    The lock only saves duplicate compiles; publishing is atomic either way.
+    So the lock file is removed once the build is published or has failed,
+    and a builder racing that removal at worst compiles the same code twice.
+    """
+    entry.parent.mkdir(parents=True, exist_ok=True)
+    if fcntl is None:
+        yield
+        return
+    lock_path = entry.parent / f"{entry.name}.lock"
+    with open(lock_path, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            try:
+                os.unlink(lock_path)
+            except OSError:
+                pass
+
+_scratch_root = None
+_scratch_ids = itertools.count()
+
+def _scratch_dir() -> str:
+    """A new empty build directory under this process's scratch area
+
+    The scratch area lives inside CODE_CACHE_DIR so finished builds can be
+    published with a rename, and is created once per process instead of a
+    mkdtemp() per compile.
+    """
+    global _scratch_root
+    if _scratch_root is None:
+        root = CODE_CACHE_DIR / f".scratch-{os.getpid()}"
+        # Left behind by a dead process that had the same pid
+        _discard(str(root))
+        root.mkdir(parents=True)
+        atexit.register(_discard, str(root))
+        _scratch_root = root
+    path = os.path.join(_scratch_root, str(next(_scratch_ids)))
+    os.mkdir(path)
+    return path
+
+def _discard(path: str):
+    """Best-effort removal of a scratch directory we created
+
+    Unlinks straight from scandir() entries, which is far lighter than
+    shutil.rmtree's per-entry stat and symlink-attack checks for
+    directories holding a handful of files.
+    """
+    try:
+        # Published cache entries are read-only
+        os.chmod(path, 0o700)
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    _discard(entry.path)
+                else:
+                    os.unlink(entry.path)
+        os.rmdir(path)
+    except OSError:
+        pass
+
+def _publish(staging_dir: str, entry: Path):
+    """Atomically move a finished build into the cache, read-only, and prune old builds"""
+    with open(os.path.join(staging_dir, _SEAL_NAME), "wb") as f:
+        f.write(_seal(staging_dir))
+    # Read-only as well, against accidental writes by programs run without root
+    with os.scandir(staging_dir) as files:
+        for file in files:
+            os.chmod(file.path, file.stat().st_mode & ~0o222)
+    try:
+        os.replace(staging_dir, entry)
+    except OSError:
+        # Without flock another process may have published the same build
+        # first; keep it only if it verifies, otherwise put ours in its place
+        if _cache_hit(entry):
+            _discard(staging_dir)
+            return
+        os.replace(staging_dir, entry)
+    # Only after the rename: moving a directory needs write access to it
+    os.chmod(entry, 0o555)
+    _prune(entry.parent)
+
+def _prune(kind_dir: Path):
+    """Drop the least recently used builds beyond CODE_CACHE_MAX_ENTRIES"""
+    entries = []
+    with os.scandir(kind_dir) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                entries.append((entry.stat(follow_symlinks=False).st_mtime, entry.path))
+    excess = len(entries) - CODE_CACHE_MAX_ENTRIES
+    if excess <= 0:
+        return
+
+    cutoff = time.time() - CODE_CACHE_MIN_AGE
+    for mtime, path in sorted(entries)[:excess]:
+        if mtime > cutoff:
+            break
+        _evict(path)
+
+def _evict(path: str):
+    """Remove a published build from the cache"""
+    # Rename over an empty scratch dir first so nobody picks up a half-deleted build
+    doomed = _scratch_dir()
+    try:
+        os.chmod(path, 0o700)
+        os.replace(path, doomed)
+    except (IsADirectoryError, NotADirectoryError):
+        # A stray file where a build belongs
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    except OSError:
+        # Another process removed it already
+        pass
+    _discard(doomed)
+
+# Resolved once so every spawn uses an absolute path instead of searching $PATH
+_JAVAC = shutil.which("javac")
+_JAVA = shutil.which("java")
+_C_COMPILERS = {"gcc": shutil.which("gcc"), "g++": shutil.which("g++")}
+
+# Snippets are compiled once and run once: skip optimization passes and keep
+# the cc1 -> as handoff in a pipe instead of temporary files
+C_COMPILE_FLAGS = ("-O0", "-pipe")
+
+_JAVA_CLASS_RE = re.compile(r"public\s+class\s+([A-Za-z_$][\w$]*)")
+
 class CodeExecutor:
     """Secure code execution with timeout and resource limits"""
     
     TIMEOUT = 10  # seconds
+    MEMORY_LIMIT = 256 * 1024 * 1024  # bytes of address space for Python snippets and compiled C/C++ programs
     
     @staticmethod
     def execute_python(code: str, input_data: str = "") -> Dict:
         """Execute Python code"""
         try:
             start_time = time.time()
-            result = subprocess.run(
-                [sys.executable, "-c", code],
-                input=input_data,
-                capture_output=True,
-                text=True,
-                timeout=CodeExecutor.TIMEOUT
-            )
+            if _python_pool is not None:
+                result = _python_pool.run(code, input_data, CodeExecutor.TIMEOUT, CodeExecutor.MEMORY_LIMIT)
+            else:
+                result = subprocess.run(
+                    [sys.executable, "-c", code],
+                    input=input_data,
+                    capture_output=True,
+                    text=True,
+                    timeout=CodeExecutor.TIMEOUT,
+                    close_fds=False
+                )
             execution_time = time.time() - start_time
             
             return {
@@ -53,48 +541,65 @@ class CodeExecutor:
     @staticmethod
     def execute_java(code: str, input_data: str = "") -> Dict:
         """Execute Java code"""
+        if _JAVAC is None:
+            return {
+                "success": False,
+                "output": "",
+                "error": "Java compiler (javac) not found. Please install JDK.",
+                "executionTime": 0
+            }
+
         temp_dir = None
         try:
-            # Create temporary directory
-            temp_dir = tempfile.mkdtemp()
-            
             # Extract class name from code
-            class_name = "Main"
-            if "public class " in code:
-                class_name = code.split("public class ")[1].split()[0].split("{")[0]
+            match = _JAVA_CLASS_RE.search(code)
+            class_name = match.group(1) if match else "Main"
             
-            # Write code to file
-            java_file = os.path.join(temp_dir, f"{class_name}.java")
-            with open(java_file, 'w') as f:
-                f.write(code)
-            
-            # Compile
+            # Identical source reuses the classes compiled last time
+            class_dir = _cache_entry("java", code)
             start_time = time.time()
-            compile_result = subprocess.run(
-                ["javac", java_file],
-                capture_output=True,
-                text=True,
+            if not _cache_hit(class_dir):
+                with _cache_lock(class_dir):
+                    if not _cache_hit(class_dir):
+                        temp_dir = _scratch_dir()
+                        
+                        # Write code to file
+                        java_file = os.path.join(temp_dir, f"{class_name}.java")
+                        with open(java_file, 'w') as f:
+                            f.write(code)
+                        
+                        # Compile. No cpu_limit: RLIMIT_CPU counts the JVM's JIT and GC
+                        # threads too, so the timeout alone bounds javac
+                        compile_result = _spawn_and_wait([_JAVAC, java_file], timeout=CodeExecutor.TIMEOUT)
+                        
+                        if compile_result.returncode != 0:
+                            return {
+                                "success": False,
+                                "output": "",
+                                "error": f"Compilation Error:\n{compile_result.stderr}",
+                                "executionTime": 0
+                            }
+                        
+                        _publish(temp_dir, class_dir)
+                        temp_dir = None
+            
+            # Execute. No cpu_limit (JIT and GC threads) or memory_limit (the JVM
+            # reserves far more address space than it uses); the timeout bounds it
+            run_result = _spawn_and_wait(
+                [_JAVA or "java", "-cp", str(class_dir), class_name],
+                input_data,
                 timeout=CodeExecutor.TIMEOUT
             )
-            
-            if compile_result.returncode != 0:
+            execution_time = time.time() - start_time
+            if run_result.returncode != 0 and not class_dir.is_dir():
+                # Pruned or evicted by another request after the cache check
                 return {
                     "success": False,
                     "output": "",
-                    "error": f"Compilation Error:\n{compile_result.stderr}",
+                    "error": "Compiled classes were removed from the cache before they could run. Please run it again.",
                     "executionTime": 0
                 }
             
-            # Execute
-            run_result = subprocess.run(
-                ["java", "-cp", temp_dir, class_name],
-                input=input_data,
-                capture_output=True,
-                text=True,
-                timeout=CodeExecutor.TIMEOUT
-            )
-            execution_time = time.time() - start_time
-            
             return {
                 "success": run_result.returncode == 0,
                 "output": run_result.stdout,
@@ -125,53 +630,73 @@ class CodeExecutor:
             }
         finally:
             # Cleanup
-            if temp_dir and os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir, ignore_errors=True)
+            if temp_dir:
+                _discard(temp_dir)
     
     @staticmethod
     def execute_c_cpp(code: str, input_data: str = "", language: str = "c") -> Dict:
         """Execute C or C++ code"""
+        compiler = "gcc" if language == "c" else "g++"
+        compiler_path = _C_COMPILERS[compiler]
+        if compiler_path is None:
+            return {
+                "success": False,
+                "output": "",
+                "error": f"{compiler.upper()} compiler not found. Please install GCC/G++.",
+                "executionTime": 0
+            }
+
         temp_dir = None
         try:
-            # Create temporary directory
-            temp_dir = tempfile.mkdtemp()
+            source_language = "c" if language == "c" else "c++"
+            program_name = "program.exe" if os.name == 'nt' else "program"
             
-            # File extensions
-            ext = ".c" if language == "c" else ".cpp"
-            compiler = "gcc" if language == "c" else "g++"
-            
-            # Write code to file
-            source_file = os.path.join(temp_dir, f"main{ext}")
-            output_file = os.path.join(temp_dir, "program.exe" if os.name == 'nt' else "program")
-            
-            with open(source_file, 'w') as f:
-                f.write(code)
-            
-            # Compile
+            # Identical source (for the same compiler build) reuses the last binary
+            build_dir = _cache_entry(language, _compiler_version(compiler_path), *C_COMPILE_FLAGS, code)
+            program = build_dir / program_name
             start_time = time.time()
-            compile_result = subprocess.run(
-                [compiler, source_file, "-o", output_file],
-                capture_output=True,
-                text=True,
-                timeout=CodeExecutor.TIMEOUT
-            )
+            if not _cache_hit(build_dir):
+                with _cache_lock(build_dir):
+                    if not _cache_hit(build_dir):
+                        temp_dir = _scratch_dir()
+                        output_file = os.path.join(temp_dir, program_name)
+                        
+                        # Compile, feeding the source on stdin instead of a file
+                        compile_result = _spawn_and_wait(
+                            [compiler_path, *C_COMPILE_FLAGS, "-x", source_language, "-o", output_file, "-"],
+                            code,
+                            timeout=CodeExecutor.TIMEOUT,
+                            cpu_limit=CodeExecutor.TIMEOUT
+                        )
+                        
+                        if compile_result.returncode != 0:
+                            return {
+                                "success": False,
+                                "output": "",
+                                "error": f"Compilation Error:\n{compile_result.stderr}",
+                                "executionTime": 0
+                            }
+                        
+                        _publish(temp_dir, build_dir)
+                        temp_dir = None
             
-            if compile_result.returncode != 0:
+            # Execute
+            try:
+                run_result = _spawn_and_wait(
+                    [str(program)],
+                    input_data,
+                    timeout=CodeExecutor.TIMEOUT,
+                    cpu_limit=CodeExecutor.TIMEOUT,
+                    memory_limit=CodeExecutor.MEMORY_LIMIT
+                )
+            except FileNotFoundError:
+                # Pruned or evicted by another request after the cache check
                 return {
                     "success": False,
                     "output": "",
-                    "error": f"Compilation Error:\n{compile_result.stderr}",
+                    "error": "Compiled program was removed from the cache before it could run. Please run it again.",
                     "executionTime": 0
                 }
-            
-            # Execute
-            run_result = subprocess.run(
-                [output_file],
-                input=input_data,
-                capture_output=True,
-                text=True,
-                timeout=CodeExecutor.TIMEOUT
-            )
             execution_time = time.time() - start_time
             
             return {
@@ -204,25 +729,28 @@ class CodeExecutor:
             }
         finally:
             # Cleanup
-            if temp_dir and os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir, ignore_errors=True)
+            if temp_dir:
+                _discard(temp_dir)
     
     @staticmethod
     def execute(language: str, code: str, input_data: str = "") -> Dict:
         """Main execution method - routes to appropriate executor"""
         language = language.lower()
-        
-        if language == "python":
-            return CodeExecutor.execute_python(code, input_data)
-        elif language == "java":
-            return CodeExecutor.execute_java(code, input_data)
-        elif language in ["c", "cpp", "c++"]:
-            lang = "c" if language == "c" else "cpp"
-            return CodeExecutor.execute_c_cpp(code, input_data, lang)
-        else:
+        executor = _DISPATCH.get(language)
+        if executor is None:
             return {
                 "success": False,
                 "output": "",
                 "error": f"Unsupported language: {language}",
                 "executionTime": 0
             }
+        return executor(code, input_data)
+
+# Language name -> executor(code, input_data); add new languages here
+_DISPATCH = {
+    "python": CodeExecutor.execute_python,
+    "java": CodeExecutor.execute_java,
+    "c": partial(CodeExecutor.execute_c_cpp, language="c"),
+    "cpp": partial(CodeExecutor.execute_c_cpp, language="cpp"),
+    "c++": partial(CodeExecutor.execute_c_cpp, language="cpp"),
+}
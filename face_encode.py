@@ -1,56 +1,64 @@
 # face_encode.py
-import base64
-import importlib
-# import face_recognition dynamically to avoid static import resolution errors in editors/linters
-try:
-    face_recognition = importlib.import_module("face_recognition")
-except Exception:
-    face_recognition = None
-try:
-    # import numpy dynamically to avoid static import resolution errors in editors/linters
-    numpy = importlib.import_module("numpy")
-    np = numpy
-except Exception:
-    np = None
-from io import BytesIO
-try:
-    # import PIL.Image dynamically to avoid static import resolution errors in editors/linters
-    Image = importlib.import_module("PIL.Image")
-except Exception:
-    Image = None
-import sys
+#
+# One-shot: pipe a single JSON request ({"image": "<base64 or data URL>"}) on
+# stdin and read one JSON reply from stdout.
+#
+# Persistent (--serve): write one JSON request per line and read each reply
+# followed by a "<<<END>>>" line, so the imports below are paid once per
+# worker instead of once per image.
+import binascii
 import json
+import sys
 
-try:
-    # Read and parse input
-    data = json.loads(sys.stdin.read())
-    img_data = data.get("image")
+import cv2
+import face_recognition
+import numpy as np
 
-    if not img_data:
-        raise ValueError("No image data provided")
+END_MARKER = "<<<END>>>"
 
-    # Strip base64 header if present
-    if "," in img_data:
-        img_data = img_data.split(",")[1]
 
-    # Decode the base64 image and convert to a numpy array
-    img_bytes = base64.b64decode(img_data)
-    image = Image.open(BytesIO(img_bytes)).convert("RGB")
+def handle(request: str) -> str:
+    try:
+        # Read and parse input
+        data = json.loads(request)
+        img_data = data.get("image")
 
-    if np is None:
-        raise ImportError("numpy is not installed. Install with: pip install numpy")
-    img_array = np.array(image)
+        if not img_data:
+            raise ValueError("No image data provided")
 
-    # Ensure face_recognition is available
-    if face_recognition is None:
-        raise ImportError("face_recognition module not installed. Install with: pip install face_recognition")
+        # Strip base64 header if present
+        comma = img_data.find(",")
+        if comma != -1:
+            img_data = img_data[comma + 1:]
 
-    # Get face encodings
-    encodings = face_recognition.face_encodings(img_array)
-    if len(encodings) == 0:
-        print(json.dumps({"error": "No face detected"}))
-    else:
-        print(json.dumps({"embedding": encodings[0].tolist()}))
+        # Decode the base64 image straight into a numpy array
+        img_bytes = binascii.a2b_base64(img_data)
+        img_array = cv2.imdecode(np.frombuffer(img_bytes, np.uint8), cv2.IMREAD_COLOR)
+        if img_array is None:
+            raise ValueError("Invalid image data")
+        # face_recognition expects RGB
+        img_array = cv2.cvtColor(img_array, cv2.COLOR_BGR2RGB)
+
+        # Get face encodings
+        encodings = face_recognition.face_encodings(img_array)
+        if len(encodings) == 0:
+            return json.dumps({"error": "No face detected"})
+        return json.dumps({"embedding": encodings[0].tolist()})
+
+    except Exception as e:
+        return json.dumps({"error": str(e)})
 
-except Exception as e:
-    print(json.dumps({"error": str(e)}))
\ No newline at end of file
+
+def serve():
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        sys.stdout.write(handle(line) + "\n" + END_MARKER + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    if "--serve" in sys.argv[1:]:
+        serve()
+    else:
+        print(handle(sys.stdin.read()))
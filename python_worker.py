@@ -0,0 +1,188 @@
+"""
+Python Worker
+Long-lived interpreter used by CodeExecutor's PythonWorkerPool
+
+Reads length-prefixed jobs on stdin, runs each snippet the way `python -c`
+would and writes the exit code and captured output back on stdout, so the
+interpreter start-up cost is paid once per worker instead of once per run.
+
+Snippets get real file descriptors 0/1/2 (the input in a memory-backed
+file, output captured in two more) and std streams built over them the way
+the interpreter builds its own, so sys.stdin.buffer, fileno() and output
+from child processes behave as under `python -c`.
+
+Each snippet runs in a forked child with CPU-time and address-space
+limits, so nothing it does (imports, monkeypatching, threads, chdir,
+os._exit) outlives the run or leaks into the next one.
+"""
+import atexit
+import builtins
+import linecache
+import os
+import struct
+import sys
+import tempfile
+import threading
+import traceback
+import types
+
+try:
+    import resource
+except ImportError:  # Windows; CodeExecutor only imports the wire formats there
+    resource = None
+
+# Request: code length, input length, CPU limit in seconds, address-space
+# limit in bytes (0 for none), then code and input as UTF-8
+REQUEST = struct.Struct("!IIIQ")
+# Response: exit code, stdout length, stderr length, then both as raw bytes
+RESPONSE = struct.Struct("!iII")
+
+
+def _read_exact(stream, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) < size:
+        raise EOFError
+    return data
+
+
+def _exit_code(code) -> int:
+    """Map a SystemExit code to a process exit status like the interpreter does"""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code & 0xFF
+    print(code, file=sys.stderr)
+    return 1
+
+
+def _anonymous_file(name: str) -> int:
+    """An fd for an unnamed, seekable scratch file (a memfd where available)"""
+    if hasattr(os, "memfd_create"):
+        return os.memfd_create(name)
+    fd, path = tempfile.mkstemp(prefix=name)
+    os.unlink(path)
+    return fd
+
+
+def _open_std_streams():
+    """Rebuild sys.stdin/stdout/stderr over fds 0-2, configured like the interpreter's own"""
+    for fd, name, mode in ((0, "stdin", "r"), (1, "stdout", "w"), (2, "stderr", "w")):
+        template = getattr(sys, f"__{name}__")
+        stream = open(
+            fd,
+            mode,
+            buffering=1 if template.line_buffering else -1,
+            encoding=template.encoding,
+            errors=template.errors,
+            newline="\n",
+            closefd=False
+        )
+        setattr(sys, name, stream)
+        setattr(sys, f"__{name}__", stream)
+
+
+def run_snippet(code: str) -> int:
+    """Run code as a fresh __main__ module on the current std streams and return its exit code"""
+    main_module = types.ModuleType("__main__")
+    main_module.__builtins__ = builtins
+    sys.modules["__main__"] = main_module
+    sys.argv = ["-c"]
+    if sys.version_info >= (3, 13):
+        # 3.13+ shows `-c` source lines in tracebacks
+        linecache.cache["<string>"] = (len(code), None, code.splitlines(True), "<string>")
+    exit_code = 0
+    try:
+        exec(compile(code, "<string>", "exec"), main_module.__dict__)
+    except SystemExit as e:
+        exit_code = _exit_code(e.code)
+    except BaseException:
+        # Drop this function's frame so the traceback matches `python -c`
+        etype, value, tb = sys.exc_info()
+        traceback.print_exception(etype, value, tb.tb_next)
+        exit_code = 1
+
+    # Finish the way the interpreter does: wait for non-daemon threads, run
+    # atexit handlers, then flush the std streams
+    threading._shutdown()
+    atexit._run_exitfuncs()
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except Exception:
+            pass
+    return exit_code
+
+
+def run_isolated(code: str, input_data: str, cpu_limit: int, memory_limit: int) -> bytes:
+    """Run a snippet in a forked child and return its packed response"""
+    for fd in (_OUTPUT_FD, _ERROR_FD):
+        os.ftruncate(fd, 0)
+        os.lseek(fd, 0, os.SEEK_SET)
+
+    pid = os.fork()
+    if pid == 0:
+        exit_code = 1
+        try:
+            os.close(_PROTOCOL_IN)
+            os.close(_PROTOCOL_OUT)
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_limit, cpu_limit + 1))
+            if memory_limit:
+                resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+            input_fd = _anonymous_file("stdin")
+            with open(input_fd, "wb", closefd=False) as f:
+                f.write(input_data.encode())
+            os.lseek(input_fd, 0, os.SEEK_SET)
+            os.dup2(input_fd, 0)
+            os.close(input_fd)
+            os.dup2(_OUTPUT_FD, 1)
+            os.dup2(_ERROR_FD, 2)
+            _open_std_streams()
+
+            exit_code = run_snippet(code)
+        finally:
+            os._exit(exit_code)
+
+    _, status = os.waitpid(pid, 0)
+    # Whatever reached fds 1/2 is kept, even if the snippet ended the child
+    # itself (os._exit, a signal, the CPU limit)
+    out = os.pread(_OUTPUT_FD, os.fstat(_OUTPUT_FD).st_size, 0)
+    err = os.pread(_ERROR_FD, os.fstat(_ERROR_FD).st_size, 0)
+    return RESPONSE.pack(os.waitstatus_to_exitcode(status), len(out), len(err)) + out + err
+
+
+_PROTOCOL_IN = _PROTOCOL_OUT = -1
+# Reused for every job; the forked child writes through them as fds 1 and 2
+_OUTPUT_FD = _ERROR_FD = -1
+
+
+def main():
+    global _PROTOCOL_IN, _PROTOCOL_OUT, _OUTPUT_FD, _ERROR_FD
+    # Move the protocol onto private fds so snippets that touch fd 0/1
+    # directly can't read the next job or corrupt a response
+    _PROTOCOL_IN, _PROTOCOL_OUT = os.dup(0), os.dup(1)
+    requests = os.fdopen(_PROTOCOL_IN, "rb")
+    responses = os.fdopen(_PROTOCOL_OUT, "wb")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    _OUTPUT_FD = _anonymous_file("stdout")
+    _ERROR_FD = _anonymous_file("stderr")
+
+    # Import from the working directory like `python -c`, not from this file's directory
+    sys.path[0] = ""
+
+    while True:
+        try:
+            code_len, input_len, cpu_limit, memory_limit = REQUEST.unpack(_read_exact(requests, REQUEST.size))
+            code = _read_exact(requests, code_len).decode()
+            input_data = _read_exact(requests, input_len).decode()
+        except EOFError:
+            return
+
+        responses.write(run_isolated(code, input_data, cpu_limit, memory_limit))
+        responses.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+#!/bin/sh
+# Production entrypoint. --preload imports the app (and quantizes the face
+# models on first boot) once in the gunicorn master; each worker then creates
+# its own ONNX Runtime sessions in the FastAPI lifespan. UvicornWorker picks
+# up uvloop and httptools automatically when they are installed.
+export WEB_CONCURRENCY="${WEB_CONCURRENCY:-2}"
+
+exec gunicorn app:app \
+    --preload \
+    --workers "$WEB_CONCURRENCY" \
+    --worker-class uvicorn.workers.UvicornWorker \
+    --bind "0.0.0.0:${PORT:-8000}" \
+    --timeout 60
@@ -1,8 +1,6 @@
-import requests
-import json
+from test_common import post
 
 # Test the AI endpoint
-url = "http://localhost:8000/api/ai/generate"
 
 payload = {
     "prompt": """Analyze this Python code:
@@ -20,7 +18,7 @@ print("Testing AI endpoint...")
 print("-" * 50)
 
 try:
-    response = requests.post(url, json=payload, timeout=30)
+    response = post(payload, timeout=30)
     print(f"Status Code: {response.status_code}")
     print("-" * 50)
     
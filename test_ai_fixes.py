@@ -1,14 +1,10 @@
-import requests
-import json
+from concurrent.futures import ThreadPoolExecutor
+
+from test_common import post
 
 # Test the AI endpoint with an error
-url = "http://localhost:8000/api/ai/generate"
 
 # Test 1: Missing colon error
-print("=" * 60)
-print("TEST 1: Missing Colon Error")
-print("=" * 60)
-
 payload1 = {
     "prompt": """A python code execution resulted in this error:
 
@@ -23,13 +19,6 @@ for i in range(5)
 Provide the corrected code."""
 }
 
-response1 = requests.post(url, json=payload1, timeout=10)
-print(response1.json()['response'])
-
-print("\n" + "=" * 60)
-print("TEST 2: Indentation Error")
-print("=" * 60)
-
 # Test 2: Indentation error
 payload2 = {
     "prompt": """A python code execution resulted in this error:
@@ -45,13 +34,6 @@ print("Greater")
 Provide the corrected code."""
 }
 
-response2 = requests.post(url, json=payload2, timeout=10)
-print(response2.json()['response'])
-
-print("\n" + "=" * 60)
-print("TEST 3: Successful Code (Suggestions)")
-print("=" * 60)
-
 # Test 3: Successful code
 payload3 = {
     "prompt": """Analyze this python code:
@@ -67,5 +49,18 @@ print(hash1)
 Provide suggestions for optimization and best practices."""
 }
 
-response3 = requests.post(url, json=payload3, timeout=10)
-print(response3.json()['response'])
+tests = [
+    ("TEST 1: Missing Colon Error", payload1),
+    ("TEST 2: Indentation Error", payload2),
+    ("TEST 3: Successful Code (Suggestions)", payload3),
+]
+
+# Send all requests at once, then print the results in order
+with ThreadPoolExecutor(max_workers=len(tests)) as pool:
+    responses = list(pool.map(post, [payload for _, payload in tests]))
+
+for i, ((title, _), response) in enumerate(zip(tests, responses)):
+    print(("\n" if i else "") + "=" * 60)
+    print(title)
+    print("=" * 60)
+    print(response.json()['response'])
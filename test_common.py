@@ -0,0 +1,10 @@
+import requests
+
+# Shared by the test scripts: one keep-alive session instead of a new
+# connection per request
+URL = "http://localhost:8000/api/ai/generate"
+SESSION = requests.Session()
+
+
+def post(payload, timeout=10):
+    return SESSION.post(URL, json=payload, timeout=timeout)
@@ -1,6 +1,4 @@
-import requests
-
-url = "http://localhost:8000/api/ai/generate"
+from test_common import post
 
 # Test NameError fix
 payload = {
@@ -19,7 +17,7 @@ Provide the corrected code."""
 print("Testing NameError fix...")
 print("=" * 60)
 
-response = requests.post(url, json=payload, timeout=10)
+response = post(payload)
 print(f"Status: {response.status_code}")
 print("=" * 60)
 print(response.json()['response'])
@@ -0,0 +1,72 @@
+"""Check that pooled Python runs behave like the `python -c` subprocess they replace.
+
+Runs each case through CodeExecutor.execute_python and a plain
+`python -c` subprocess and compares output, errors and success.
+Usable with pytest or as a script.
+"""
+import subprocess
+import sys
+
+from code_executor import CodeExecutor
+
+CASES = {
+    "input": ("print(input() * 2)", "ab\n"),
+    "stdin.buffer": ("import sys\nprint(sys.stdin.buffer.read())", "1 2\n3 4\n"),
+    "stdin.buffer.readline": (
+        "import sys\ninput = sys.stdin.buffer.readline\nn = int(input())\nprint(sum(map(int, input().split())) * n)",
+        "2\n1 2 3\n",
+    ),
+    "stdout.buffer": ("import sys\nsys.stdout.buffer.write(b'raw\\n')", ""),
+    "fileno": ("import sys\nprint(sys.stdin.fileno(), sys.stdout.fileno(), sys.stderr.fileno())", ""),
+    "os.system": ("import os\nprint('before', flush=True)\nos.system('echo from shell')", ""),
+    "subprocess": ("import subprocess, sys\nsubprocess.run([sys.executable, '-c', 'print(42)'])", ""),
+    "argv": ("import sys\nprint(sys.argv)", ""),
+    "__main__": ("import __main__\nx = 5\nprint(__main__.x)", ""),
+    "stderr": ("import sys\nprint('oops', file=sys.stderr)", ""),
+    "exception": ("1/0", ""),
+    "sys.exit": ("import sys\nprint('x')\nsys.exit(3)", ""),
+    "sys.exit message": ("import sys\nsys.exit('bye')", ""),
+    "os._exit": ("import os, sys\nprint('kept', flush=True)\nos._exit(4)", ""),
+    "unicode": ("print('héllo ✓')", ""),
+    "thread": (
+        "import threading, time\nthreading.Thread(target=lambda: (time.sleep(.1), print('from thread'))).start()",
+        "",
+    ),
+    "atexit": ("import atexit\natexit.register(print, 'at exit')\nprint('main')", ""),
+    "atexit after sys.exit": ("import atexit, sys\natexit.register(print, 'at exit')\nsys.exit(2)", ""),
+}
+
+
+def run_python_c(code: str, input_data: str) -> dict:
+    result = subprocess.run([sys.executable, "-c", code], input=input_data, capture_output=True, text=True)
+    return {
+        "success": result.returncode == 0,
+        "output": result.stdout,
+        "error": result.stderr if result.stderr else None,
+    }
+
+
+def compare(name: str) -> tuple:
+    code, input_data = CASES[name]
+    pooled = CodeExecutor.execute_python(code, input_data)
+    pooled.pop("executionTime")
+    return pooled, run_python_c(code, input_data)
+
+
+def test_parity():
+    for name in CASES:
+        pooled, expected = compare(name)
+        assert pooled == expected, name
+
+
+if __name__ == "__main__":
+    failures = 0
+    for name in CASES:
+        pooled, expected = compare(name)
+        status = "OK" if pooled == expected else "MISMATCH"
+        failures += pooled != expected
+        print(f"{status:8} {name}")
+        if pooled != expected:
+            print(f"  pooled:   {pooled}")
+            print(f"  python -c: {expected}")
+    sys.exit(1 if failures else 0)